@@ -1,15 +1,62 @@
-import json
+import logging
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from .sender import get_sender_email
+from functools import partial
+from typing import NamedTuple
+from .sender import get_sender_email, _get_senders
+from ..utils.response_utils import parsed
+
+logger = logging.getLogger(__name__)
 
 __all__ = [
+    'CampaignRow',
     'get_campaign_list',
     'get_campaign_details',
+    'build_campaign_details',
     'check_existing_campaign',
+    'clear_campaign_list_cache',
     'get_default_suppression_group',
     'create_contacts_list'
 ]
 
+# Upper bound on concurrent SendGrid requests issued by a single helper
+API_MAX_WORKERS = 10
+
+# Number of emails per contacts search query
+CONTACTS_SEARCH_CHUNK_SIZE = 100
+
+# Maximum number of contacts SendGrid accepts in a single contacts PUT
+CONTACTS_UPLOAD_CHUNK_SIZE = 30000
+
+# Contacts PUTs built and in flight at once for one list. Kept low because SendGrid
+# rate-limits the contacts endpoint; the pooled session retries 429s with backoff
+CONTACTS_UPLOAD_MAX_IN_FLIGHT = 2
+
+# Seconds suppression group lookups are reused within a process
+SUPPRESSION_GROUPS_TTL = 300
+
+# Suppression group lookups per client: (fetched_at, value). Weakly keyed by the
+# client itself, so entries die with it and a new client never sees another's data
+_suppression_groups_cache = weakref.WeakKeyDictionary()
+_default_suppression_group_cache = weakref.WeakKeyDictionary()
+
+# Seconds a fetched single sends listing is reused within a process
+CAMPAIGN_LIST_TTL = 30
+
+# Single sends listings per client: (fetched_at, campaigns), weakly keyed by the client
+_campaign_list_cache = weakref.WeakKeyDictionary()
+
+class CampaignRow(NamedTuple):
+    """Summary of a campaign as returned by get_campaign_list"""
+    campaign_id: str
+    subject: str
+    scheduled_at: str
+    sender: str
+    status: str
+    stats: dict = None
+
 def get_existing_lists(client, name_prefix):
     """
     Get existing contact lists that start with the given prefix.
@@ -26,21 +73,53 @@ def get_existing_lists(client, name_prefix):
         if not response or not response.body:
             return []
             
-        data = json.loads(response.body.decode('utf-8'))
+        data = parsed(response)
         lists = data.get('result', [])
         
         return [lst for lst in lists if lst.get('name', '').startswith(name_prefix)]
             
     except Exception as e:
-        print(f"Warning - Error checking existing lists: {str(e)}")
+        logger.warning("Warning - Error checking existing lists: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.warning("API Response: %s", e.body.decode('utf-8'))
         return []
 
+def _search_contacts(client, emails):
+    """
+    Run a single contacts search query for the given email addresses.
+    
+    Args:
+        client: SendGrid client
+        emails: List of email addresses to check
+        
+    Returns:
+        set: Set of existing email addresses
+    """
+    # Quote emails for search, escaping any embedded backslashes and quotes
+    search_body = {
+        "query": "(email in [" + ','.join(
+            '"%s"' % email.replace('\\', '\\\\').replace('"', '\\"') for email in emails
+        ) + "])"
+    }
+    
+    response = client.client.marketing.contacts.search.post(request_body=search_body)
+    if not response or not response.body:
+        return set()
+        
+    data = parsed(response)
+    if not isinstance(data, dict):
+        return set()
+        
+    contacts = data.get('result', [])
+    return {contact.get('email') for contact in contacts if contact.get('email')}
+
 def get_existing_contacts(client, emails):
     """
     Get existing contacts from SendGrid.
     
+    Emails are searched in chunks of CONTACTS_SEARCH_CHUNK_SIZE to stay within
+    the query size limit, with the chunks queried concurrently.
+    
     Args:
         client: SendGrid client
         emails: List of email addresses to check
@@ -49,29 +128,96 @@ def get_existing_contacts(client, emails):
         set: Set of existing email addresses
     """
     try:
-        # Format emails for search
-        formatted_emails = [f'"{email}"' for email in emails]
-        search_body = {
-            "query": f"(email in [{','.join(formatted_emails)}])"
-        }
-        
-        response = client.client.marketing.contacts.search.post(request_body=search_body)
-        if not response or not response.body:
+        chunks = [emails[i:i + CONTACTS_SEARCH_CHUNK_SIZE]
+                  for i in range(0, len(emails), CONTACTS_SEARCH_CHUNK_SIZE)]
+        if not chunks:
             return set()
             
-        data = json.loads(response.body.decode('utf-8'))
-        if not isinstance(data, dict):
-            return set()
-            
-        contacts = data.get('result', [])
-        return {contact.get('email') for contact in contacts if contact.get('email')}
+        existing = set()
+        with ThreadPoolExecutor(max_workers=min(API_MAX_WORKERS, len(chunks))) as executor:
+            for found in executor.map(partial(_search_contacts, client), chunks):
+                existing |= found
+        return existing
         
     except Exception as e:
-        print(f"Warning - Error checking existing contacts: {str(e)}")
+        logger.warning("Warning - Error checking existing contacts: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.warning("API Response: %s", e.body.decode('utf-8'))
         return set()
 
+def _put_contacts(client, list_id, emails):
+    """
+    Add or update a single batch of contacts in a list.
+    
+    Args:
+        client: SendGrid client
+        list_id: ID of the list to add the contacts to
+        emails: List of email addresses, at most CONTACTS_UPLOAD_CHUNK_SIZE long
+        
+    Returns:
+        int: Number of contacts in the batch
+    """
+    contacts_body = {
+        "list_ids": [list_id],
+        "contacts": [{"email": email} for email in emails]
+    }
+    
+    add_response = client.client.marketing.contacts.put(request_body=contacts_body)
+    if not add_response or add_response.status_code not in [200, 201, 202]:
+        raise ValueError("Failed to update contacts in list")
+    return len(emails)
+
+def _upload_contacts(client, list_id, contacts):
+    """
+    Add or update contacts in a list in batches of CONTACTS_UPLOAD_CHUNK_SIZE.
+    
+    Batches are sliced lazily and at most CONTACTS_UPLOAD_MAX_IN_FLIGHT of them
+    are built and uploading at any time. No new batches are started once one
+    fails; the batches already in flight are allowed to finish.
+    
+    Args:
+        client: SendGrid client
+        list_id: ID of the list to add the contacts to
+        contacts: List of email addresses
+        
+    Returns:
+        int: Number of contacts uploaded
+        
+    Raises:
+        Exception: The error of the first failed batch, after logging how many
+            contacts made it into the list
+    """
+    starts = iter(range(0, len(contacts), CONTACTS_UPLOAD_CHUNK_SIZE))
+    uploaded = 0
+    failures = []
+    in_flight = set()
+    
+    with ThreadPoolExecutor(max_workers=CONTACTS_UPLOAD_MAX_IN_FLIGHT) as executor:
+        while True:
+            # Top up the window with the next batches unless a batch already failed
+            while not failures and len(in_flight) < CONTACTS_UPLOAD_MAX_IN_FLIGHT:
+                start = next(starts, None)
+                if start is None:
+                    break
+                batch = contacts[start:start + CONTACTS_UPLOAD_CHUNK_SIZE]
+                in_flight.add(executor.submit(_put_contacts, client, list_id, batch))
+                
+            if not in_flight:
+                break
+                
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    uploaded += future.result()
+                except Exception as e:
+                    failures.append(e)
+    
+    if failures:
+        logger.error("Uploaded %s of %s contacts to list %s before a batch failed",
+                     uploaded, len(contacts), list_id)
+        raise failures[0]
+    return uploaded
+
 def create_contacts_list(client, list_name, contacts):
     """
     Create or update a contacts list in SendGrid.
@@ -90,9 +236,9 @@ def create_contacts_list(client, list_name, contacts):
         existing_lists = get_existing_lists(client, base_name)
         
         if existing_lists:
-            print(f"Found {len(existing_lists)} existing lists with similar name")
+            logger.info("Found %s existing lists with similar name", len(existing_lists))
             list_id = existing_lists[0].get('id')
-            print(f"Using existing list: {existing_lists[0].get('name')}")
+            logger.info("Using existing list: %s", existing_lists[0].get('name'))
         else:
             # Create new list
             list_body = {
@@ -102,63 +248,69 @@ def create_contacts_list(client, list_name, contacts):
             if not response or not response.body:
                 raise ValueError("Empty response when creating list")
                 
-            list_data = json.loads(response.body.decode('utf-8'))
+            list_data = parsed(response)
             list_id = list_data.get('id')
             
             if not list_id:
                 raise ValueError("No list ID in response")
                 
-            print(f"Created new list: {list_name}")
+            logger.info("Created new list: %s", list_name)
 
-        # Handle contacts
-        contacts_body = {
-            "list_ids": [list_id],
-            "contacts": [{"email": email} for email in contacts]
-        }
-        
-        # Add/update all contacts in one go
-        add_response = client.client.marketing.contacts.put(request_body=contacts_body)
-        if not add_response or add_response.status_code not in [200, 201, 202]:
-            raise ValueError("Failed to update contacts in list")
-            
-        print(f"Successfully added/updated {len(contacts)} contacts to the list")
+        # Add/update contacts in batches the API accepts; there is nothing to PUT for an empty list
+        if contacts:
+            _upload_contacts(client, list_id, contacts)
+            logger.info("Successfully added/updated %s contacts to the list", len(contacts))
+        else:
+            logger.info("No contacts to add to the list")
         
         return list_id
         
     except Exception as e:
-        print(f"Error managing contacts list: {str(e)}")
+        logger.error("Error managing contacts list: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         return None
 
 def get_suppression_groups(client):
     """
     Get list of available suppression groups.
+    Results are cached per client for SUPPRESSION_GROUPS_TTL seconds.
     """
+    cached = _suppression_groups_cache.get(client)
+    if cached and time.monotonic() - cached[0] < SUPPRESSION_GROUPS_TTL:
+        return cached[1]
+        
     try:
         response = client.client.asm.groups.get()
         if not response or not response.body:
             return []
             
-        groups = json.loads(response.body.decode('utf-8'))
+        groups = parsed(response)
         if not isinstance(groups, list):
             return []
             
+        _suppression_groups_cache[client] = (time.monotonic(), groups)
         return groups
         
     except Exception as e:
-        print(f"Error getting suppression groups: {str(e)}")
+        logger.error("Error getting suppression groups: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         return []
 
 def get_default_suppression_group(client):
     """
     Get the first available suppression group or create one if none exists.
+    Results are cached per client for SUPPRESSION_GROUPS_TTL seconds.
     """
+    cached = _default_suppression_group_cache.get(client)
+    if cached and time.monotonic() - cached[0] < SUPPRESSION_GROUPS_TTL:
+        return cached[1]
+        
     groups = get_suppression_groups(client)
     
     if groups:
+        _default_suppression_group_cache[client] = (time.monotonic(), groups[0]['id'])
         return groups[0]['id']
         
     # Create a new suppression group if none exists
@@ -173,59 +325,92 @@ def get_default_suppression_group(client):
         if not response or not response.body:
             raise ValueError("Empty response when creating suppression group")
             
-        group_data = json.loads(response.body.decode('utf-8'))
-        return group_data.get('id')
+        group_data = parsed(response)
+        group_id = group_data.get('id')
+        if group_id:
+            _default_suppression_group_cache[client] = (time.monotonic(), group_id)
+        return group_id
         
     except Exception as e:
-        print(f"Error creating suppression group: {str(e)}")
+        logger.error("Error creating suppression group: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         raise
 
+def _list_singlesends(client, include_stats=False):
+    """
+    Lists all single sends as CampaignRow tuples. The listing itself is
+    reused for CAMPAIGN_LIST_TTL seconds; stats are always fetched fresh.
+    
+    Args:
+        client: SendGrid client
+        include_stats: Whether to also fetch detailed stats for every campaign
+        
+    Returns:
+        list: CampaignRow entries, with stats only set when include_stats is set
+    """
+    cached = _campaign_list_cache.get(client)
+    if cached and time.monotonic() - cached[0] < CAMPAIGN_LIST_TTL:
+        campaigns = cached[1]
+    else:
+        campaigns = _fetch_singlesends(client)
+        _campaign_list_cache[client] = (time.monotonic(), campaigns)
+    
+    if include_stats and campaigns:
+        # Fetch stats for all campaigns concurrently instead of one round-trip at a time
+        campaign_ids = [campaign.campaign_id for campaign in campaigns]
+        with ThreadPoolExecutor(max_workers=min(API_MAX_WORKERS, len(campaign_ids))) as executor:
+            campaigns = [campaign._replace(stats=stats) for campaign, stats in
+                         zip(campaigns, executor.map(partial(get_detailed_stats, client), campaign_ids))]
+    
+    return campaigns
+
+def _fetch_singlesends(client):
+    """
+    Fetches all single sends from the API and projects them into CampaignRow tuples.
+    """
+    response = client.client.marketing.singlesends.get()
+    if not response or not response.body:
+        return []
+        
+    data = parsed(response)
+    if not isinstance(data, dict):
+        return []
+        
+    campaign_list = data.get('result', [])
+    if not campaign_list:
+        return []
+    
+    # Get sender information
+    _, sender_emails = _get_senders(client)
+    
+    campaigns = [CampaignRow(
+        campaign.get('id'),
+        campaign.get('name'),
+        campaign.get('send_at'),
+        sender_emails.get(campaign.get('sender_id'), 'Unknown'),
+        campaign.get('status')
+    ) for campaign in campaign_list]
+    
+    return campaigns
+
+def clear_campaign_list_cache(client):
+    """
+    Drop the cached single sends listing for a client, e.g. after creating a campaign.
+    """
+    _campaign_list_cache.pop(client, None)
+
 def get_campaign_list(client):
     """
     Returns a list of all campaigns with their basic information.
     """
     try:
-        response = client.client.marketing.singlesends.get()
-        if not response or not response.body:
-            return []
-            
-        data = json.loads(response.body.decode('utf-8'))
-        if not isinstance(data, dict):
-            return []
-            
-        campaign_list = data.get('result', [])
-        if not campaign_list:
-            return []
-        
-        # Get sender information
-        sender_response = client.client.marketing.senders.get()
-        senders = {}
-        if sender_response and sender_response.body:
-            sender_data = json.loads(sender_response.body.decode('utf-8'))
-            if isinstance(sender_data, list):
-                for sender in sender_data:
-                    senders[sender.get('id')] = sender.get('from', {}).get('email')
-        
-        campaigns = []
-        for campaign in campaign_list:
-            campaign_stats = get_detailed_stats(client, campaign.get('id'))
-            campaigns.append({
-                'campaign_id': campaign.get('id'),
-                'subject': campaign.get('name'),
-                'scheduled_at': campaign.get('send_at'),
-                'from': senders.get(campaign.get('sender_id'), 'Unknown'),
-                'status': campaign.get('status'),
-                'stats': campaign_stats
-            })
-        
-        return campaigns
+        return _list_singlesends(client, include_stats=True)
     
     except Exception as e:
-        print(f"Error getting campaign list: {str(e)}")
+        logger.error("Error getting campaign list: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         return []
 
 def get_detailed_stats(client, campaign_id):
@@ -237,15 +422,42 @@ def get_detailed_stats(client, campaign_id):
         stats_response = client.client.marketing.stats.singlesends._(campaign_id).get()
         stats = {}
         if stats_response and stats_response.body:
-            stats = json.loads(stats_response.body.decode('utf-8'))
+            stats = parsed(stats_response)
 
         return stats
     except Exception as e:
-        print(f"Warning - Error getting stats: {str(e)}")
+        logger.warning("Warning - Error getting stats: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.warning("API Response: %s", e.body.decode('utf-8'))
         return {}
 
+def build_campaign_details(campaign, sender_email, stats):
+    """
+    Builds the campaign details dict from a single send object.
+    
+    Args:
+        campaign: Single send object as returned by the SendGrid API
+        sender_email: Email address of the campaign sender
+        stats: Campaign stats to include
+        
+    Returns:
+        dict: Campaign details
+    """
+    html_content = campaign.get('email_config', {}).get('html_content')
+    html_preview = html_content[:255] + "..." if html_content else None
+    
+    return {
+        'campaign_id': campaign.get('id'),
+        'subject': campaign.get('name'),
+        'scheduled_at': campaign.get('send_at'),
+        'from': sender_email,
+        'html_content': html_preview,
+        'status': campaign.get('status'),
+        'send_to': campaign.get('send_to'),
+        'stats': stats,
+        'last_checked': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
 def get_campaign_details(client, campaign_id):
     """
     Returns detailed information about a specific campaign.
@@ -255,37 +467,20 @@ def get_campaign_details(client, campaign_id):
         if not response or not response.body:
             return None
             
-        campaign = json.loads(response.body.decode('utf-8'))
+        campaign = parsed(response)
         
         # Get sender information
-        sender_response = client.client.marketing.senders.get()
-        sender_email = 'Unknown'
-        if sender_response and sender_response.body:
-            sender_data = json.loads(sender_response.body.decode('utf-8'))
-            if isinstance(sender_data, list):
-                for sender in sender_data:
-                    if sender.get('id') == campaign.get('sender_id'):
-                        sender_email = sender.get('from', {}).get('email')
-                        break
+        _, sender_emails = _get_senders(client)
+        sender_email = sender_emails.get(campaign.get('sender_id'), 'Unknown')
         
         # Get detailed stats
         stats = get_detailed_stats(client, campaign_id)
             
-        return {
-            'campaign_id': campaign.get('id'),
-            'subject': campaign.get('name'),
-            'scheduled_at': campaign.get('send_at'),
-            'from': sender_email,
-            'html_content': campaign.get('email_config', {}).get('html_content')[:255] + "..." if campaign.get('email_config', {}).get('html_content') else None,
-            'status': campaign.get('status'),
-            'send_to': campaign.get('send_to'),
-            'stats': stats,
-            'last_checked': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        return build_campaign_details(campaign, sender_email, stats)
     except Exception as e:
-        print(f"Error getting campaign details: {str(e)}")
+        logger.error("Error getting campaign details: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         return None
 
 def check_existing_campaign(client, subject):
@@ -293,14 +488,14 @@ def check_existing_campaign(client, subject):
     Check if a campaign with the given subject already exists.
     """
     try:
-        campaigns = get_campaign_list(client)
-        for campaign in campaigns:
-            if campaign.get('subject') == subject:
+        # Only the names are needed here, so skip the per-campaign stats requests
+        for campaign in _list_singlesends(client):
+            if campaign.subject == subject:
                 return campaign
         return None
         
     except Exception as e:
-        print(f"Error checking existing campaign: {str(e)}")
+        logger.error("Error checking existing campaign: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         return None
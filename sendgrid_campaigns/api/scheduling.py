@@ -1,4 +1,8 @@
-import json
+import logging
+import orjson
+from ..utils.response_utils import parsed
+
+logger = logging.getLogger(__name__)
 
 def schedule_campaign(client, campaign_id, schedule_time):
     """
@@ -10,27 +14,29 @@ def schedule_campaign(client, campaign_id, schedule_time):
         schedule_time: Time in RFC3339/ISO8601 format
         
     Returns:
-        bool: True if successful, False otherwise
+        dict: The schedule as returned by the API (send_at and status), or None if scheduling failed
     """
     try:
         schedule_body = {
             "send_at": schedule_time
         }
         
-        print("Scheduling campaign:", json.dumps(schedule_body, indent=2))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Scheduling campaign: %s", orjson.dumps(schedule_body, option=orjson.OPT_INDENT_2).decode())
         response = client.client.marketing.singlesends._(campaign_id).schedule.put(
             request_body=schedule_body
         )
         
         if response and response.status_code in [200, 201, 202]:
-            print(f"Successfully scheduled campaign for: {schedule_time}")
-            return True
+            logger.info("Successfully scheduled campaign for: %s", schedule_time)
+            schedule = parsed(response) if response.body else None
+            return schedule if isinstance(schedule, dict) else {"send_at": schedule_time, "status": None}
             
-        print(f"Unexpected response when scheduling: {response.status_code if response else 'No response'}")
-        return False
+        logger.error("Unexpected response when scheduling: %s", response.status_code if response else 'No response')
+        return None
         
     except Exception as e:
-        print(f"Error scheduling campaign: {str(e)}")
+        logger.error("Error scheduling campaign: %s", e)
         if hasattr(e, 'body'):
-            print(f"Schedule error response: {e.body.decode('utf-8')}")
-        return False
+            logger.error("Schedule error response: %s", e.body.decode('utf-8'))
+        return None
@@ -1,4 +1,43 @@
-import json
+import logging
+import time
+import weakref
+from ..utils.response_utils import parsed
+
+logger = logging.getLogger(__name__)
+
+# Parsed senders responses per client: (fetched_at, senders, sender_emails). Weakly keyed
+# by the client itself, so entries die with it and a new client never sees another's data
+_senders_cache = weakref.WeakKeyDictionary()
+
+def _get_senders(client, ttl=60):
+    """
+    Fetches the verified senders list, reusing the parsed response for up to
+    `ttl` seconds so repeated lookups don't hit the senders endpoint again.
+    
+    Args:
+        client: SendGrid client
+        ttl: Seconds a cached senders list stays valid
+        
+    Returns:
+        tuple: (list of sender objects as returned by the SendGrid API,
+                dict mapping sender ID to sender email)
+    """
+    cached = _senders_cache.get(client)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1], cached[2]
+        
+    response = client.client.marketing.senders.get()
+    if not response or not response.body:
+        return [], {}
+        
+    senders = parsed(response)
+    if not isinstance(senders, list):
+        senders = []
+        
+    sender_emails = {sender.get('id'): sender.get('from', {}).get('email', 'Unknown')
+                     for sender in senders}
+    _senders_cache[client] = (time.monotonic(), senders, sender_emails)
+    return senders, sender_emails
 
 def get_sender_id(client, sender_email):
     """
@@ -8,14 +47,7 @@ def get_sender_id(client, sender_email):
         return None
         
     try:
-        response = client.client.marketing.senders.get()
-        if not response or not response.body:
-            raise ValueError("Empty response from SendGrid API")
-            
-        senders = json.loads(response.body.decode('utf-8'))
-        if not isinstance(senders, list):
-            senders = []
-        
+        senders, _ = _get_senders(client)
         for sender in senders:
             if (sender.get('from', {}).get('email') == sender_email):
                 return sender['id']
@@ -23,9 +55,9 @@ def get_sender_id(client, sender_email):
         raise ValueError(f"No verified sender found for email: {sender_email}")
     
     except Exception as e:
-        print(f"Error getting sender ID: {str(e)}")
+        logger.error("Error getting sender ID: %s", e)
         if hasattr(e, 'body'):
-            print(f"API Response: {e.body.decode('utf-8')}")
+            logger.error("API Response: %s", e.body.decode('utf-8'))
         raise
 
 def get_sender_email(client, sender_id):
@@ -33,19 +65,8 @@ def get_sender_email(client, sender_id):
     Get sender email from sender ID.
     """
     try:
-        response = client.client.marketing.senders.get()
-        if not response or not response.body:
-            return 'Unknown'
-            
-        senders = json.loads(response.body.decode('utf-8'))
-        if not isinstance(senders, list):
-            return 'Unknown'
-            
-        for sender in senders:
-            if sender.get('id') == sender_id:
-                return sender.get('from', {}).get('email', 'Unknown')
-                
-        return 'Unknown'
+        _, sender_emails = _get_senders(client)
+        return sender_emails.get(sender_id, 'Unknown')
         
     except Exception:
         return 'Unknown'
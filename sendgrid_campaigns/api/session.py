@@ -0,0 +1,93 @@
+from io import BytesIO
+from urllib.error import HTTPError
+
+import requests
+from python_http_client import Client
+from python_http_client.exceptions import handle_error
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+__all__ = [
+    'SessionClient',
+    'use_pooled_session'
+]
+
+# Process-wide keep-alive session shared by every SendGrid API call
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=10,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+))
+
+class _SessionResponse:
+    """Exposes a requests response through the urllib interface python_http_client reads"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def getcode(self):
+        return self._response.status_code
+
+    def read(self):
+        return self._response.content
+
+    def info(self):
+        return self._response.headers
+
+class SessionClient(Client):
+    """
+    python_http_client Client that sends requests through the shared pooled
+    session instead of opening a new urllib connection per call.
+    """
+
+    def _build_client(self, name=None):
+        url_path = self._url_path + [name] if name else self._url_path
+        return SessionClient(host=self.host,
+                             version=self._version,
+                             request_headers=self.request_headers,
+                             url_path=url_path,
+                             append_slash=self.append_slash,
+                             timeout=self.timeout)
+
+    def _make_request(self, opener, request, timeout=None):
+        url = request.get_full_url()
+        response = _session.request(
+            request.get_method(),
+            url,
+            headers=request.headers,
+            data=request.data,
+            timeout=timeout or self.timeout
+        )
+
+        if response.status_code >= 400:
+            error = HTTPError(url, response.status_code, response.reason,
+                              response.headers, BytesIO(response.content))
+            raise handle_error(error) from None
+
+        return _SessionResponse(response)
+
+def use_pooled_session(client):
+    """
+    Swaps the HTTP client of a SendGridAPIClient for a SessionClient so all
+    API calls reuse pooled keep-alive connections.
+
+    Args:
+        client: SendGridAPIClient instance
+
+    Returns:
+        The same client, for chaining
+    """
+    http_client = client.client
+    client.client = SessionClient(host=http_client.host,
+                                  version=http_client._version,
+                                  request_headers=http_client.request_headers,
+                                  url_path=http_client._url_path,
+                                  append_slash=http_client.append_slash,
+                                  timeout=http_client.timeout)
+    return client
@@ -1,17 +1,35 @@
-import json
+import logging
+import orjson
 from datetime import datetime
 from .utils.file_utils import parse_receivers_file, read_html_content
 from .utils.date_utils import parse_schedule_time
+from .utils.response_utils import parsed
 from .api.sender import get_sender_id
 from .api.campaign import (get_campaign_list, get_campaign_details, 
                          check_existing_campaign, get_default_suppression_group,
-                         create_contacts_list)
+                         create_contacts_list, build_campaign_details,
+                         clear_campaign_list_cache)
 from .api.scheduling import schedule_campaign
 
+logger = logging.getLogger(__name__)
+
+# CLI arguments that don't select an operation
+IGNORED_ARGS = frozenset({'json_config_file_path', 'command'})
+
+# Arguments required to create or update a campaign
+REQUIRED_FIELDS = frozenset({'subject', 'sender', 'receivers_file_path',
+                             'html_body_file_path', 'scheduled_at'})
+
 def create_or_update_campaign(client, args):
     """
     Creates a new campaign or updates an existing one using SingleSends API.
     """
+    # Parse and validate local inputs before any API calls so bad input fails fast
+    schedule_time = parse_schedule_time(args.scheduled_at)
+    receivers = parse_receivers_file(args.receivers_file_path)
+    html_body = read_html_content(args.html_body_file_path)
+    
+    current_details = None
     if args.campaign_id:
         # Check campaign status before update
         current_details = get_campaign_details(client, args.campaign_id)
@@ -28,25 +46,18 @@ def create_or_update_campaign(client, args):
             raise ValueError(
                 f"A campaign with the subject '{args.subject}' already exists.\n"
                 f"Existing campaign details:\n"
-                f"- Campaign ID: {existing_campaign['campaign_id']}\n"
-                f"- Subject: {existing_campaign['subject']}\n"
-                f"- Scheduled At: {existing_campaign['scheduled_at']}\n"
-                f"- From: {existing_campaign['from']}\n"
-                f"- Status: {existing_campaign.get('status', 'Unknown')}\n"
+                f"- Campaign ID: {existing_campaign.campaign_id}\n"
+                f"- Subject: {existing_campaign.subject}\n"
+                f"- Scheduled At: {existing_campaign.scheduled_at}\n"
+                f"- From: {existing_campaign.sender}\n"
+                f"- Status: {existing_campaign.status or 'Unknown'}\n"
                 f"To update this campaign, please provide its campaign_id."
             )
 
-    # Parse files and get required data
-    receivers = parse_receivers_file(args.receivers_file_path)
-    html_body = read_html_content(args.html_body_file_path)
-    
     # Print truncated HTML preview
-    print(f"\nHTML content preview (first 255 characters):")
-    print(f"{html_body[:255]}...")
-    print()
+    logger.info("\nHTML content preview (first 255 characters):\n%s...\n", html_body[:255])
     
     sender_id = get_sender_id(client, args.sender)
-    schedule_time = parse_schedule_time(args.scheduled_at)
     
     # Get or create suppression group
     suppression_group_id = get_default_suppression_group(client)
@@ -84,51 +95,66 @@ def create_or_update_campaign(client, args):
     }
 
     try:
-        # When printing the body, exclude html_content for clarity
-        print_body = campaign_body.copy()
-        print_body['email_config'] = {k: v for k, v in print_body['email_config'].items() if k != 'html_content'}
-        print("Creating campaign with body:", json.dumps(print_body, indent=2))
+        if logger.isEnabledFor(logging.DEBUG):
+            # When printing the body, exclude html_content for clarity
+            print_body = campaign_body.copy()
+            print_body['email_config'] = {k: v for k, v in print_body['email_config'].items() if k != 'html_content'}
+            logger.debug("Creating campaign with body: %s", orjson.dumps(print_body, option=orjson.OPT_INDENT_2).decode())
         
         if args.campaign_id:
             # Update existing campaign
             response = client.client.marketing.singlesends._(args.campaign_id).patch(request_body=campaign_body)
             campaign_id = args.campaign_id
-            print(f"Updated existing campaign with ID: {campaign_id}")
+            if response and response.body:
+                response_data = parsed(response)
+            else:
+                # No body to read back; fall back to what was sent and the status fetched before the update
+                response_data = dict(campaign_body, id=campaign_id,
+                                     status=current_details.get('status') if current_details else None)
+            logger.info("Updated existing campaign with ID: %s", campaign_id)
         else:
             # Create new campaign
             response = client.client.marketing.singlesends.post(request_body=campaign_body)
             if not response or not response.body:
                 raise ValueError("Empty response from SendGrid API when creating campaign")
                 
-            response_data = json.loads(response.body.decode('utf-8'))
+            response_data = parsed(response)
             campaign_id = response_data.get("id")
             if not campaign_id:
                 raise ValueError(f"No campaign ID in response: {response_data}")
-            print(f"Created new campaign with ID: {campaign_id}")
+            logger.info("Created new campaign with ID: %s", campaign_id)
+
+        # The campaign listing is stale now that a campaign was created or renamed
+        clear_campaign_list_cache(client)
 
         # Schedule the campaign
-        if not schedule_campaign(client, campaign_id, schedule_time):
-            print("Warning: Campaign created but scheduling failed")
+        schedule = schedule_campaign(client, campaign_id, schedule_time)
+        if schedule is None:
+            logger.warning("Warning: Campaign created but scheduling failed")
 
-        # Get and show final campaign details
-        final_details = get_campaign_details(client, campaign_id)
-        print("\nFinal Campaign Details:")
-        print(json.dumps(final_details, indent=2))
+        # Build final campaign details from the create/update and schedule responses instead
+        # of refetching them; stats aren't fetched for a campaign that hasn't been sent
+        final_campaign = dict(response_data)
+        if schedule is not None:
+            final_campaign.update(send_at=schedule.get('send_at', schedule_time), status=schedule.get('status'))
+        final_details = build_campaign_details(final_campaign, args.sender, stats=None)
+        logger.info("\nFinal Campaign Details (from the create/update and schedule responses):\n%s",
+                    orjson.dumps(final_details, option=orjson.OPT_INDENT_2).decode())
 
         return campaign_id
 
     except Exception as e:
-        print(f"Error in API request: {str(e)}")
+        logger.error("Error in API request: %s", e)
         if hasattr(e, 'body'):
             error_body = e.body.decode('utf-8')
-            print(f"API Response: {error_body}")
+            logger.error("API Response: %s", error_body)
             try:
-                error_json = json.loads(error_body)
+                error_json = orjson.loads(error_body)
                 if 'errors' in error_json:
                     for error in error_json['errors']:
-                        print(f"Field: {error.get('field', 'N/A')}")
-                        print(f"Message: {error.get('message', 'N/A')}")
-            except json.JSONDecodeError:
+                        logger.error("Field: %s", error.get('field', 'N/A'))
+                        logger.error("Message: %s", error.get('message', 'N/A'))
+            except orjson.JSONDecodeError:
                 pass
         raise
 
@@ -136,12 +162,11 @@ def process_campaign_request(client, args):
     """
     Main function to process campaign requests based on provided arguments.
     """
-    # Build a list of provided arguments (excluding json_config_file_path and command)
-    provided_args = [
-        arg for arg in ['campaign_id', 'subject', 'sender',
-                       'html_body_file_path', 'scheduled_at', 'receivers_file_path']
-        if hasattr(args, arg) and getattr(args, arg) is not None
-    ]
+    # Build the set of provided arguments (excluding json_config_file_path and command)
+    provided_args = frozenset(
+        name for name, value in vars(args).items()
+        if value is not None and name not in IGNORED_ARGS
+    )
     
     # Case 1: Only json_config_file_path provided - return list of campaigns
     if not provided_args:
@@ -151,20 +176,14 @@ def process_campaign_request(client, args):
         return campaigns
     
     # Case 2: Only campaign_id provided - return campaign details
-    if provided_args == ['campaign_id']:
+    if provided_args == {'campaign_id'}:
         details = get_campaign_details(client, args.campaign_id)
         if not details:
             return "No campaign found"
         return details
     
-    # Check for all required fields for creation/update
-    required_fields = ['subject', 'sender', 'receivers_file_path',
-                      'html_body_file_path', 'scheduled_at']
-    
-    has_all_required = all(field in provided_args for field in required_fields)
-    
     # Case 3 & 4: All required fields present (with or without campaign_id)
-    if has_all_required:
+    if REQUIRED_FIELDS <= provided_args:
         return create_or_update_campaign(client, args)
         
     # Invalid combination of arguments
@@ -1,9 +1,17 @@
 import argparse
 import json
+import logging
+import os
 import sys
 from sendgrid import SendGridAPIClient
 from .eml_extractor import extract_html_from_eml
 from .campaign_manager import process_campaign_request
+from .api.session import use_pooled_session
+
+def _log_level(name):
+    """Maps a level name such as "debug" to its logging level, defaulting to INFO for unknown names"""
+    level = logging.getLevelName(name.upper())
+    return level if isinstance(level, int) else logging.INFO
 
 def main():
     parser = argparse.ArgumentParser(description="SendGrid Campaign Management CLI")
@@ -27,6 +35,11 @@ def main():
 
     args = parser.parse_args()
 
+    # SG_LOG controls this package's verbosity (e.g. SG_LOG=debug prints request payloads);
+    # third-party libraries stay at WARNING so their request logging doesn't leak headers
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", stream=sys.stdout)
+    logging.getLogger("sendgrid_campaigns").setLevel(_log_level(os.getenv("SG_LOG", "info")))
+
     try:
         # Load config for both commands
         try:
@@ -50,7 +63,7 @@ def main():
                 print("Error: SENDGRID_API_KEY must be present in the JSON config file")
                 sys.exit(1)
                 
-            client = SendGridAPIClient(config["SENDGRID_API_KEY"])
+            client = use_pooled_session(SendGridAPIClient(config["SENDGRID_API_KEY"]))
             client.config = config  # Add config to client for Azure operations
             result = process_campaign_request(client, args)
             
@@ -60,10 +73,10 @@ def main():
                 else:
                     print("\nCampaign List:")
                     for campaign in result:
-                        print(f"\nCampaign ID: {campaign['campaign_id']}")
-                        print(f"Subject: {campaign['subject']}")
-                        print(f"Scheduled At: {campaign['scheduled_at']}")
-                        print(f"From: {campaign['from']}")
+                        print(f"\nCampaign ID: {campaign.campaign_id}")
+                        print(f"Subject: {campaign.subject}")
+                        print(f"Scheduled At: {campaign.scheduled_at}")
+                        print(f"From: {campaign.sender}")
             elif isinstance(result, dict):
                 print("\nCampaign Details:")
                 for key, value in result.items():
@@ -1,15 +1,111 @@
+import logging
 import os
 import re
-from email import message_from_file
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from email import policy
+from email.parser import BytesParser
 from bs4 import BeautifulSoup
-from PIL import Image
+from PIL import ExifTags, Image
 from io import BytesIO
 import base64
-from azure.storage.blob import BlobServiceClient
+import binascii
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobServiceClient, ContentSettings
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import mimetypes
 import hashlib
 from datetime import datetime
 
+try:
+    import numpy as np
+    from turbojpeg import (TurboJPEG, TJPF_RGB, TJSAMP_420, TJFLAG_ACCURATEDCT,
+                           TJCS_CMYK, TJCS_YCCK)
+    _TJ = TurboJPEG()
+except (ImportError, RuntimeError):
+    # PyTurboJPEG or the libjpeg-turbo library is unavailable; use Pillow's codec
+    _TJ = None
+
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    # pyvips or the libvips library is unavailable
+    pyvips = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on images compressed and uploaded concurrently
+IMAGE_UPLOAD_MAX_WORKERS = 8
+
+# Source images larger than this (in bytes) are shrunk with libvips when available
+VIPS_MIN_BYTES = 256_000
+
+# JPEG sources at most this size (in bytes) and 1200px are uploaded as-is when
+# re-encoding them doesn't make them any smaller
+PASSTHROUGH_MAX_BYTES = 150_000
+
+# Header segments a JPEG may carry and still be uploaded as-is: JFIF (APP0) and
+# Adobe (APP14). EXIF/XMP (APP1), IPTC (APP13), comments etc. must be stripped
+_PASSTHROUGH_SEGMENTS = frozenset({'APP0', 'APP14'})
+
+# Transpose that displays an image upright for each EXIF orientation, applied on the
+# Pillow/libjpeg-turbo path to match libvips' thumbnail autorotation
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90
+}
+
+# Filename sanitization patterns used by get_base_filename
+_NON_WORD = re.compile(r'[^\w\s-]')
+_SPACE = re.compile(r'[-\s]+')
+
+# Memoized MIME type -> file extension lookup used when naming uploaded images
+_guess_extension = lru_cache(maxsize=64)(mimetypes.guess_extension)
+
+# Static document wrapped around the email body in the generated HTML file,
+# pre-encoded so only the body needs encoding per email
+_HTML_HEAD = b"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <style>
+        body { max-width: 800px; margin: 0 auto; padding: 20px; }
+        img { max-width: 100%; height: auto; }
+    </style>
+</head>
+<body>
+"""
+_HTML_FOOT = b"""
+</body>
+</html>"""
+
+# Process-wide keep-alive session shared by every Azure client; retries are left
+# to the azure-core retry policy, as in azure-core's own default session
+_azure_session = requests.Session()
+_azure_session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+))
+
 class AzureStorageError(Exception):
     """Custom exception for Azure Storage operations"""
     pass
@@ -18,54 +114,143 @@ def get_azure_blob_url(config, blob_name):
     """Constructs the Azure CDN URL for a blob"""
     return f"https://{config['azure_cdn_storage_account_name']}.blob.core.windows.net/{config['azure_cdn_container_name']}/{config['azure_cdn_blob_path']}/{blob_name}"
 
-def upload_to_azure(config, image_data, filename):
+@lru_cache(maxsize=8)
+def _container_client(account_name, account_key, container_name):
+    """Returns a ContainerClient for the container, reused across uploads"""
+    connection_string = (
+        f"DefaultEndpointsProtocol=https;"
+        f"AccountName={account_name};"
+        f"AccountKey={account_key};"
+        f"EndpointSuffix=core.windows.net"
+    )
+    transport = RequestsTransport(session=_azure_session, session_owner=False)
+    blob_service_client = BlobServiceClient.from_connection_string(connection_string, transport=transport)
+    return blob_service_client.get_container_client(container_name)
+
+def upload_to_azure(config, image_data, filename, content_type=None):
     """Uploads an image to Azure Blob Storage and returns its public URL"""
     try:
-        connection_string = (
-            f"DefaultEndpointsProtocol=https;"
-            f"AccountName={config['azure_cdn_storage_account_name']};"
-            f"AccountKey={config['azure_cdn_storage_account_key']};"
-            f"EndpointSuffix=core.windows.net"
+        container_client = _container_client(
+            config['azure_cdn_storage_account_name'],
+            config['azure_cdn_storage_account_key'],
+            config['azure_cdn_container_name']
         )
         
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        container_client = blob_service_client.get_container_client(config['azure_cdn_container_name'])
-        
         # Construct blob path
         blob_path = f"{config['azure_cdn_blob_path']}/{filename}" if config['azure_cdn_blob_path'] else filename
         blob_client = container_client.get_blob_client(blob_path)
         
         # Upload the image
-        blob_client.upload_blob(image_data, overwrite=True)
+        blob_client.upload_blob(
+            image_data,
+            overwrite=True,
+            max_concurrency=4,
+            content_settings=ContentSettings(content_type=content_type, cache_control='public, max-age=31536000')
+        )
         return get_azure_blob_url(config, filename)
         
     except Exception as e:
         raise AzureStorageError(f"Failed to upload to Azure: {str(e)}")
 
+def _compress_with_vips(image_data):
+    """Shrinks and JPEG-encodes an image in one libvips pipeline, returning None if libvips fails"""
+    try:
+        image = pyvips.Image.thumbnail_buffer(image_data, 1200, height=1200, size='down')
+        if image.hasalpha():
+            image = image.flatten(background=[255, 255, 255])
+        return image.jpegsave_buffer(Q=60, optimize_coding=True, strip=True)
+    except pyvips.Error:
+        return None
+
+def _decode_with_turbojpeg(image_data):
+    """Decodes a JPEG to an RGB image with libjpeg-turbo, returning None if it can't convert the source"""
+    try:
+        width, height, _, colorspace = _TJ.decode_header(image_data)
+        # libjpeg-turbo can't convert CMYK/YCCK sources to RGB; Pillow can
+        if colorspace in (TJCS_CMYK, TJCS_YCCK):
+            return None
+        
+        # Decode with libjpeg-turbo's SIMD decoder. Large sources are scaled down
+        # by 1/2, 1/4 or 1/8 during the IDCT while staying >= 1200px, leaving only
+        # the final fractional step to the LANCZOS resize in _compress_with_pillow
+        scale = max((k for k in (1, 2, 4, 8)
+                     if (1, k) in _TJ.scaling_factors and max(width, height) // k >= 1200), default=1)
+        return Image.fromarray(_TJ.decode(image_data, pixel_format=TJPF_RGB,
+                                          scaling_factor=(1, scale) if scale > 1 else None))
+    except (OSError, ValueError, RuntimeError):
+        # PyTurboJPEG reports corrupt or unsupported input through any of these
+        return None
+
+def _compress_with_pillow(image_data):
+    """Decodes, flattens, downsizes and JPEG-encodes an image with Pillow (or libjpeg-turbo)"""
+    # Image.open only parses the header until the pixels are needed
+    source = Image.open(BytesIO(image_data))
+    image = None
+    if _TJ is not None and image_data[:2] == b'\xff\xd8':
+        image = _decode_with_turbojpeg(image_data)
+    if image is None:
+        image = source
+    
+    # Apply the EXIF orientation, which the re-encode drops, so the image still displays upright
+    transpose = _EXIF_TRANSPOSE.get(source.getexif().get(ExifTags.Base.Orientation))
+    if transpose is not None:
+        image = image.transpose(transpose)
+    
+    # Convert RGBA to RGB if needed
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    
+    # Reduce resolution if image is too large
+    if image.width > 1200 or image.height > 1200:
+        ratio = min(1200/image.width, 1200/image.height)
+        new_size = (int(image.width * ratio), int(image.height * ratio))
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+    
+    # Save with compression
+    if _TJ is not None:
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return _TJ.encode(np.asarray(image), quality=60, pixel_format=TJPF_RGB,
+                          jpeg_subsample=TJSAMP_420, flags=TJFLAG_ACCURATEDCT)
+    
+    # Pillow carries some metadata (e.g. JPEG comments) over from the source; drop it all
+    image.info.clear()
+    output = BytesIO()
+    image.save(output, format='JPEG', quality=60, optimize=True)
+    # getvalue() hands back BytesIO's internal buffer without copying it
+    return output.getvalue()
+
+def _is_passthrough_candidate(image_data):
+    """Checks from the JPEG header alone whether an image already fits and carries no metadata"""
+    if image_data[:2] != b'\xff\xd8' or len(image_data) > PASSTHROUGH_MAX_BYTES:
+        return False
+    
+    # Image.open only parses the header; pixel data is never decoded here
+    with Image.open(BytesIO(image_data)) as image:
+        return (image.mode in ('RGB', 'L') and image.width <= 1200 and image.height <= 1200
+                and all(marker in _PASSTHROUGH_SEGMENTS for marker, _ in image.applist))
+
 def compress_image(image_data):
     """Compresses the image by reducing resolution if too large and applying JPEG compression"""
     try:
-        image = Image.open(BytesIO(image_data))
+        compressed_data = None
         
-        # Convert RGBA to RGB if needed
-        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            background.paste(image, mask=image.split()[-1])
-            image = background
+        # Large JPEG/PNG sources: let libvips fuse decode, shrink and encode
+        if (pyvips is not None and len(image_data) > VIPS_MIN_BYTES
+                and (image_data[:2] == b'\xff\xd8' or image_data[:4] == b'\x89PNG')):
+            compressed_data = _compress_with_vips(image_data)
         
-        # Reduce resolution if image is too large
-        if image.width > 1200 or image.height > 1200:
-            ratio = min(1200/image.width, 1200/image.height)
-            new_size = (int(image.width * ratio), int(image.height * ratio))
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
+        if compressed_data is None:
+            compressed_data = _compress_with_pillow(image_data)
         
-        # Save with compression
-        output = BytesIO()
-        image.save(output, format='JPEG', quality=60, optimize=True)
-        output.seek(0)
-        compressed_data = output.getvalue()
+        # Keep a small, metadata-free JPEG when re-encoding didn't shrink it, avoiding generation loss
+        if len(image_data) <= len(compressed_data) and _is_passthrough_candidate(image_data):
+            logger.info("Keeping %.1fKB JPEG as-is", len(image_data)/1024)
+            return bytes(image_data)
         
-        print(f"Compressed image from {len(image_data)/1024:.1f}KB to {len(compressed_data)/1024:.1f}KB")
+        logger.info("Compressed image from %.1fKB to %.1fKB", len(image_data)/1024, len(compressed_data)/1024)
         return compressed_data
         
     except Exception as e:
@@ -86,25 +271,37 @@ def verify_azure_config(config):
 def get_base_filename(html_file_path):
     """Generates a base filename from the HTML path"""
     base = os.path.splitext(os.path.basename(html_file_path))[0]
-    sanitized = re.sub(r'[^\w\s-]', '_', base)
-    sanitized = re.sub(r'[-\s]+', '_', sanitized)
+    sanitized = _NON_WORD.sub('_', base)
+    sanitized = _SPACE.sub('_', sanitized)
     return sanitized.strip('_')
 
-def process_image(img_tag, image_data, config, base_filename, index):
-    """Processes a single image - compresses it, uploads to Azure, and updates the tag"""
+def _content_type(image_data):
+    """Returns the MIME type of encoded image data, read from its header"""
+    with Image.open(BytesIO(image_data)) as image:
+        return image.get_format_mimetype()
+
+def process_image(image_data, config, base_filename, index):
+    """Processes a single image - compresses it and uploads it to Azure, returning (filename, cdn_url)"""
     # Compress image
     compressed_data = compress_image(image_data['data'])
     
     # Generate unique filename using the base name
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    file_hash = hashlib.md5(compressed_data).hexdigest()[:8]
-    ext = mimetypes.guess_extension(image_data['type']) or '.jpg'
+    if xxhash is not None:
+        file_hash = xxhash.xxh3_64(compressed_data).hexdigest()[:8]
+    else:
+        file_hash = hashlib.md5(compressed_data).hexdigest()[:8]
+    # Name and tag the blob after the format actually uploaded, not the source's
+    content_type = _content_type(compressed_data)
+    ext = _guess_extension(content_type) or '.jpg'
     filename = f"mail_campaigns/{base_filename}_{index}_{timestamp}_{file_hash}{ext}"
     
     # Upload and get URL
-    cdn_url = upload_to_azure(config, compressed_data, filename)
-    
-    # Update image tag
+    cdn_url = upload_to_azure(config, compressed_data, filename, content_type=content_type)
+    return filename, cdn_url
+
+def update_image_tag(img_tag, cdn_url):
+    """Points an image tag at its CDN URL and cleans up its attributes"""
     img_tag['src'] = cdn_url
     
     # Preserve dimensions but clean up other attributes
@@ -115,14 +312,18 @@ def process_image(img_tag, image_data, config, base_filename, index):
     for attr in list(img_tag.attrs):
         if attr not in allowed_attrs:
             del img_tag[attr]
-    
-    return filename
 
-def process_html_content(soup):
-    """Add clicktracking=off to all links"""
-    for a in soup.find_all('a'):
-        a['clicktracking'] = 'off'
-    return soup
+def _fast_decode(part):
+    """Decodes a MIME part payload, using pybase64's SIMD decoder for base64 parts"""
+    if pybase64 is None or part.get('Content-Transfer-Encoding', '').strip().lower() != 'base64':
+        return part.get_payload(decode=True)
+    
+    raw = part.get_payload(decode=False).encode('ascii', 'ignore')
+    try:
+        return pybase64.b64decode_as_bytearray(raw.translate(None, b'\r\n'), validate=False)
+    except binascii.Error:
+        # The email package tolerates malformed base64 (e.g. bad padding) and records a defect
+        return part.get_payload(decode=True)
 
 def extract_html_from_eml(client, eml_file_path, html_body_file_path):
     """
@@ -143,8 +344,8 @@ def extract_html_from_eml(client, eml_file_path, html_body_file_path):
         verify_azure_config(client.config)
 
         # Parse the email
-        with open(eml_file_path, 'r') as eml_file:
-            email_message = message_from_file(eml_file)
+        with open(eml_file_path, 'rb') as eml_file:
+            email_message = BytesParser(policy=policy.default).parse(eml_file)
 
         # Extract HTML and image data
         html_content = None
@@ -153,17 +354,17 @@ def extract_html_from_eml(client, eml_file_path, html_body_file_path):
         if email_message.is_multipart():
             for part in email_message.walk():
                 if part.get_content_type() == 'text/html':
-                    html_content = part.get_payload(decode=True).decode(part.get_content_charset())
+                    html_content = part.get_content()
                 elif part.get_content_type().startswith('image/'):
                     content_id = part.get('Content-ID', '').strip('<>')
                     if content_id:
                         image_data[content_id] = {
-                            'data': part.get_payload(decode=True),
+                            'data': _fast_decode(part),
                             'type': part.get_content_type()
                         }
         else:
             if email_message.get_content_type() == 'text/html':
-                html_content = email_message.get_payload(decode=True).decode(email_message.get_content_charset())
+                html_content = email_message.get_content()
 
         if not html_content:
             raise ValueError("No HTML content found in the email")
@@ -172,50 +373,51 @@ def extract_html_from_eml(client, eml_file_path, html_body_file_path):
         base_filename = get_base_filename(html_body_file_path)
 
         # Process HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
-        soup = process_html_content(soup)
+        soup = BeautifulSoup(html_content, 'lxml')
         processed_images = []
-        image_count = 1
         
-        # Handle each image
-        for img in soup.find_all('img'):
-            if img.get('src', '').startswith('cid:'):
-                cid = img['src'].replace('cid:', '')
-                if cid in image_data:
+        # Single tree walk: disable click tracking on links and collect the embedded images to process
+        pending = []
+        for tag in soup.find_all(['a', 'img']):
+            if tag.name == 'a':
+                tag['clicktracking'] = 'off'
+            else:
+                src = tag.get('src', '')
+                cid = src[4:] if src.startswith('cid:') else None
+                if cid and cid in image_data:
+                    pending.append((tag, cid, len(pending) + 1))
+        
+        # Compress and upload images concurrently; tags are only updated from this thread
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(IMAGE_UPLOAD_MAX_WORKERS, len(pending))) as executor:
+                futures = {
+                    executor.submit(process_image, image_data[cid], client.config, base_filename, index): (img, cid)
+                    for img, cid, index in pending
+                }
+                for future in as_completed(futures):
+                    img, cid = futures[future]
                     try:
-                        filename = process_image(img, image_data[cid], client.config, base_filename, image_count)
-                        processed_images.append(filename)
-                        print(f"Processed image: {filename}")
-                        image_count += 1
+                        filename, cdn_url = future.result()
                     except Exception as e:
-                        print(f"Failed to process image {cid}: {str(e)}")
+                        logger.warning("Failed to process image %s: %s", cid, e)
                         continue
+                    update_image_tag(img, cdn_url)
+                    processed_images.append(filename)
+                    logger.info("Processed image: %s", filename)
 
         # Create clean HTML
-        clean_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        body {{ max-width: 800px; margin: 0 auto; padding: 20px; }}
-        img {{ max-width: 100%; height: auto; }}
-    </style>
-</head>
-<body>
-{soup.body.decode_contents() if soup.body else str(soup)}
-</body>
-</html>"""
+        body = soup.body
+        inner = body.decode_contents() if body else str(soup)
 
-        # Save the HTML
+        # Save the HTML; only the body is encoded, the wrapper is already bytes
         os.makedirs(os.path.dirname(html_body_file_path), exist_ok=True)
-        with open(html_body_file_path, 'w', encoding='utf-8') as f:
-            f.write(clean_html)
+        with open(html_body_file_path, 'wb') as f:
+            f.writelines([_HTML_HEAD, inner.encode('utf-8'), _HTML_FOOT])
 
-        print(f"Generated HTML file at: {html_body_file_path}")
-        print(f"Processed {len(processed_images)} images")
+        logger.info("Generated HTML file at: %s", html_body_file_path)
+        logger.info("Processed %s images", len(processed_images))
         return html_body_file_path
         
     except Exception as e:
-        print(f"Error processing email: {str(e)}")
+        logger.error("Error processing email: %s", e)
         raise
@@ -10,5 +10,12 @@ def parse_schedule_time(time_str):
     Returns:
         str: Time in RFC3339/ISO8601 format
     """
-    dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
+    # fromisoformat is implemented in C, unlike strptime's format interpreter, but it
+    # accepts any ISO 8601 form (offsets, week dates, ...). Use it only for the exact
+    # zero-padded "YYYY-MM-DD HH:MM:SS" shape and let strptime judge everything else
+    if (len(time_str) == 19 and time_str.isascii() and time_str[10] == ' '
+            and time_str[4] == time_str[7] == '-' and time_str[13] == time_str[16] == ':'):
+        dt = datetime.fromisoformat(time_str.replace(' ', 'T', 1))
+    else:
+        dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
     return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -1,17 +1,21 @@
+import re
+
+# Matches the address inside the first "<...>" of a line
+_ADDRESS_PATTERN = re.compile(rb'[^<]*<([^<>]+)>')
+
 def parse_receivers_file(file_path):
     """
     Parse a file containing email addresses in "Full Name <email@domain.com>" format.
     Lines not matching this format are ignored.
     """
-    receivers = []
     if not file_path:
-        return receivers
+        return []
         
-    with open(file_path, 'r') as file:
-        for line in file:
-            if "<" in line and ">" in line:
-                receivers.append(line.split("<")[1].split(">")[0].strip())
-    return receivers
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    # splitlines() handles LF, CRLF and bare CR line endings like text mode did
+    matches = (_ADDRESS_PATTERN.match(line) for line in data.splitlines())
+    return [match.group(1).decode('utf-8').strip() for match in matches if match]
 
 def read_html_content(file_path):
     """
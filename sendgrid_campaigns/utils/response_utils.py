@@ -0,0 +1,10 @@
+import orjson
+
+def parsed(response):
+    """
+    Decode and parse a SendGrid API response body as JSON.
+    The parsed object is cached on the response, so repeated calls are free.
+    """
+    if not hasattr(response, '_parsed'):
+        response._parsed = orjson.loads(response.body)
+    return response._parsed
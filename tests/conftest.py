@@ -0,0 +1,8 @@
+import pytest
+
+from tests.fakes import FakeSendGrid
+
+
+@pytest.fixture
+def sendgrid():
+    return FakeSendGrid()
@@ -0,0 +1,67 @@
+import threading
+
+import orjson
+
+
+class FakeResponse:
+    """Response shaped like python_http_client's: a status code and a raw JSON body"""
+
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.body = orjson.dumps(body) if body is not None else b''
+
+
+class _FakePath:
+    """Builds request paths through attribute access and _(), like python_http_client.Client"""
+
+    def __init__(self, api, segments):
+        self._api = api
+        self._segments = segments
+
+    def __getattr__(self, name):
+        return _FakePath(self._api, self._segments + [name])
+
+    def _(self, name):
+        return _FakePath(self._api, self._segments + [str(name)])
+
+    def get(self, **kwargs):
+        return self._api.request('GET', self._segments, kwargs)
+
+    def post(self, **kwargs):
+        return self._api.request('POST', self._segments, kwargs)
+
+    def put(self, **kwargs):
+        return self._api.request('PUT', self._segments, kwargs)
+
+    def patch(self, **kwargs):
+        return self._api.request('PATCH', self._segments, kwargs)
+
+
+class FakeSendGrid:
+    """
+    Stand-in for SendGridAPIClient. Requests are recorded and answered by the
+    handler routed for their method and path, e.g. ('GET', 'marketing/senders').
+    A handler is a FakeResponse or a callable taking the request body.
+    """
+
+    def __init__(self, api_key='SG.test'):
+        self.api_key = api_key
+        self.host = 'https://api.sendgrid.com'
+        self.client = _FakePath(self, [])
+        self.routes = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def route(self, method, path, handler):
+        self.routes[(method, path)] = handler
+
+    def request(self, method, segments, kwargs):
+        path = '/'.join(segments)
+        body = kwargs.get('request_body')
+        with self._lock:
+            self.calls.append((method, path, body))
+        handler = self.routes[(method, path)]
+        return handler(body) if callable(handler) else handler
+
+    def count(self, method, path):
+        return sum(1 for call in self.calls if call[:2] == (method, path))
@@ -0,0 +1,165 @@
+import gc
+import threading
+import time
+
+import pytest
+
+from sendgrid_campaigns.api import campaign
+from tests.fakes import FakeResponse, FakeSendGrid
+
+
+@pytest.fixture
+def contacts_list(sendgrid):
+    """Routes list creation so create_contacts_list goes straight to uploading"""
+    sendgrid.route('GET', 'marketing/lists', FakeResponse(body={'result': []}))
+    sendgrid.route('POST', 'marketing/lists', FakeResponse(body={'id': 'list-1'}))
+    return sendgrid
+
+
+def _emails(count):
+    return [f'user{i}@example.com' for i in range(count)]
+
+
+def test_create_contacts_list_uploads_in_batches(monkeypatch, contacts_list):
+    monkeypatch.setattr(campaign, 'CONTACTS_UPLOAD_CHUNK_SIZE', 3)
+    batches = []
+
+    def put(body):
+        batches.append([contact['email'] for contact in body['contacts']])
+        assert body['list_ids'] == ['list-1']
+        return FakeResponse(202, {'job_id': 'job'})
+
+    contacts_list.route('PUT', 'marketing/contacts', put)
+    emails = _emails(8)
+
+    assert campaign.create_contacts_list(contacts_list, 'List for x - 1', emails) == 'list-1'
+    assert sorted(email for batch in batches for email in batch) == sorted(emails)
+    assert sorted(len(batch) for batch in batches) == [2, 3, 3]
+
+
+def test_create_contacts_list_bounds_batches_in_flight(monkeypatch, contacts_list):
+    monkeypatch.setattr(campaign, 'CONTACTS_UPLOAD_CHUNK_SIZE', 1)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def put(body):
+        with lock:
+            active.append(body)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(body)
+        return FakeResponse(202)
+
+    contacts_list.route('PUT', 'marketing/contacts', put)
+
+    assert campaign.create_contacts_list(contacts_list, 'List for x - 1', _emails(10)) == 'list-1'
+    assert contacts_list.count('PUT', 'marketing/contacts') == 10
+    assert max(peak) <= campaign.CONTACTS_UPLOAD_MAX_IN_FLIGHT
+
+
+def test_create_contacts_list_stops_after_failed_batch(monkeypatch, contacts_list):
+    monkeypatch.setattr(campaign, 'CONTACTS_UPLOAD_CHUNK_SIZE', 1)
+    contacts_list.route('PUT', 'marketing/contacts', FakeResponse(500))
+
+    assert campaign.create_contacts_list(contacts_list, 'List for x - 1', _emails(10)) is None
+    assert contacts_list.count('PUT', 'marketing/contacts') <= campaign.CONTACTS_UPLOAD_MAX_IN_FLIGHT
+
+
+def test_create_contacts_list_without_contacts_skips_upload(contacts_list):
+    assert campaign.create_contacts_list(contacts_list, 'List for x - 1', []) == 'list-1'
+    assert contacts_list.count('PUT', 'marketing/contacts') == 0
+
+
+def test_default_suppression_group_is_cached(sendgrid):
+    sendgrid.route('GET', 'asm/groups', FakeResponse(body=[{'id': 5}, {'id': 6}]))
+    assert campaign.get_default_suppression_group(sendgrid) == 5
+    assert campaign.get_default_suppression_group(sendgrid) == 5
+    assert campaign.get_suppression_groups(sendgrid) == [{'id': 5}, {'id': 6}]
+    assert sendgrid.count('GET', 'asm/groups') == 1
+
+
+def test_suppression_group_cache_is_not_shared_with_a_new_client():
+    for group_id in range(20):
+        # Each client is freed before the next is built, so CPython readily reuses its id()
+        client = FakeSendGrid()
+        client.route('GET', 'asm/groups', FakeResponse(body=[{'id': group_id}]))
+        assert campaign.get_default_suppression_group(client) == group_id
+        del client
+        gc.collect()
+
+
+def _listing(sendgrid, *names):
+    sendgrid.route('GET', 'marketing/senders', FakeResponse(body=[{'id': 7, 'from': {'email': 'news@example.com'}}]))
+    sendgrid.route('GET', 'marketing/singlesends', FakeResponse(body={'result': [
+        {'id': f'c{i}', 'name': name, 'send_at': None, 'sender_id': 7, 'status': 'draft'}
+        for i, name in enumerate(names)
+    ]}))
+
+
+def test_campaign_listing_is_cached_until_cleared(sendgrid):
+    _listing(sendgrid, 'Launch')
+    assert campaign.check_existing_campaign(sendgrid, 'Launch').campaign_id == 'c0'
+    assert campaign.check_existing_campaign(sendgrid, 'Other') is None
+    assert sendgrid.count('GET', 'marketing/singlesends') == 1
+
+    _listing(sendgrid, 'Launch', 'Other')
+    campaign.clear_campaign_list_cache(sendgrid)
+    assert campaign.check_existing_campaign(sendgrid, 'Other').campaign_id == 'c1'
+    assert sendgrid.count('GET', 'marketing/singlesends') == 2
+
+
+def test_campaign_listing_cache_expires(monkeypatch, sendgrid):
+    _listing(sendgrid, 'Launch')
+    campaign.check_existing_campaign(sendgrid, 'Launch')
+    now = campaign.time.monotonic()
+    monkeypatch.setattr(campaign.time, 'monotonic', lambda: now + campaign.CAMPAIGN_LIST_TTL + 1)
+    campaign.check_existing_campaign(sendgrid, 'Launch')
+    assert sendgrid.count('GET', 'marketing/singlesends') == 2
+
+
+def test_campaign_list_fetches_fresh_stats(sendgrid):
+    _listing(sendgrid, 'Launch', 'Other')
+    sendgrid.route('GET', 'marketing/stats/singlesends/c0', FakeResponse(body={'opens': 1}))
+    sendgrid.route('GET', 'marketing/stats/singlesends/c1', FakeResponse(body={'opens': 2}))
+
+    campaigns = campaign.get_campaign_list(sendgrid)
+    assert [(row.campaign_id, row.sender, row.stats) for row in campaigns] == [
+        ('c0', 'news@example.com', {'opens': 1}), ('c1', 'news@example.com', {'opens': 2})]
+    campaign.get_campaign_list(sendgrid)
+    assert sendgrid.count('GET', 'marketing/singlesends') == 1
+    assert sendgrid.count('GET', 'marketing/stats/singlesends/c0') == 2
+
+
+def test_campaign_listing_cache_is_not_shared_with_a_new_client():
+    for account in range(20):
+        # Each client is freed before the next is built, so CPython readily reuses its id()
+        client = FakeSendGrid()
+        _listing(client, f'Campaign {account}')
+        assert campaign.check_existing_campaign(client, f'Campaign {account}') is not None
+        del client
+        gc.collect()
+
+
+def test_existing_contacts_are_searched_in_chunks(monkeypatch, sendgrid):
+    monkeypatch.setattr(campaign, 'CONTACTS_SEARCH_CHUNK_SIZE', 2)
+    known = {'user1@example.com', 'user4@example.com', 'quote"d@example.com'}
+    queries = []
+
+    def search(body):
+        queries.append(body['query'])
+        return FakeResponse(body={'result': [{'email': email} for email in known
+                                             if '"%s"' % email.replace('"', '\\"') in body['query']]})
+
+    sendgrid.route('POST', 'marketing/contacts/search', search)
+    emails = _emails(5) + ['quote"d@example.com']
+
+    assert campaign.get_existing_contacts(sendgrid, emails) == known
+    assert len(queries) == 3
+    assert '(email in ["user4@example.com","quote\\"d@example.com"])' in queries
+
+
+def test_existing_contacts_without_emails(sendgrid):
+    assert campaign.get_existing_contacts(sendgrid, []) == set()
+    assert sendgrid.calls == []
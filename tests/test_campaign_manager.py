@@ -0,0 +1,62 @@
+import logging
+from argparse import Namespace
+
+import orjson
+import pytest
+
+from sendgrid_campaigns.campaign_manager import create_or_update_campaign
+from tests.fakes import FakeResponse
+
+
+@pytest.fixture
+def campaign_args(tmp_path):
+    receivers = tmp_path / 'receivers.txt'
+    receivers.write_text('Alice <alice@example.com>\n')
+    html_body = tmp_path / 'body.html'
+    html_body.write_text('<p>Hello</p>')
+    return Namespace(campaign_id=None, subject='Launch', sender='news@example.com',
+                     receivers_file_path=str(receivers), html_body_file_path=str(html_body),
+                     scheduled_at='2030-01-01 09:00:00')
+
+
+@pytest.fixture
+def api(sendgrid):
+    """Routes everything create_or_update_campaign needs before creating the campaign"""
+    sendgrid.route('GET', 'marketing/singlesends', FakeResponse(body={'result': []}))
+    sendgrid.route('GET', 'marketing/senders', FakeResponse(body=[{'id': 7, 'from': {'email': 'news@example.com'}}]))
+    sendgrid.route('GET', 'asm/groups', FakeResponse(body=[{'id': 1}]))
+    sendgrid.route('GET', 'marketing/lists', FakeResponse(body={'result': []}))
+    sendgrid.route('POST', 'marketing/lists', FakeResponse(body={'id': 'list-1'}))
+    sendgrid.route('PUT', 'marketing/contacts', FakeResponse(202))
+    return sendgrid
+
+
+def _final_details(caplog):
+    record = next(r for r in caplog.records if r.getMessage().lstrip().startswith('Final Campaign Details'))
+    return orjson.loads(record.getMessage().split(':\n', 1)[1])
+
+
+def test_final_details_use_schedule_response(api, campaign_args, caplog):
+    api.route('POST', 'marketing/singlesends', FakeResponse(201, {'id': 'c1', 'name': 'Launch', 'status': 'draft'}))
+    api.route('PUT', 'marketing/singlesends/c1/schedule',
+              FakeResponse(201, {'send_at': '2030-01-01T09:00:00Z', 'status': 'scheduled'}))
+
+    with caplog.at_level(logging.INFO, logger='sendgrid_campaigns'):
+        assert create_or_update_campaign(api, campaign_args) == 'c1'
+
+    details = _final_details(caplog)
+    assert (details['status'], details['scheduled_at']) == ('scheduled', '2030-01-01T09:00:00Z')
+
+
+def test_final_details_keep_draft_status_when_scheduling_fails(api, campaign_args, caplog):
+    campaign_args.campaign_id = 'c1'
+    api.route('GET', 'marketing/singlesends/c1', FakeResponse(body={'id': 'c1', 'status': 'draft'}))
+    api.route('GET', 'marketing/stats/singlesends/c1', FakeResponse(body={}))
+    api.route('PATCH', 'marketing/singlesends/c1', FakeResponse(200))
+    api.route('PUT', 'marketing/singlesends/c1/schedule', FakeResponse(500))
+
+    with caplog.at_level(logging.INFO, logger='sendgrid_campaigns'):
+        assert create_or_update_campaign(api, campaign_args) == 'c1'
+
+    details = _final_details(caplog)
+    assert (details['status'], details['scheduled_at']) == ('draft', None)
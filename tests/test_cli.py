@@ -0,0 +1,18 @@
+import logging
+
+import pytest
+
+from sendgrid_campaigns.cli import _log_level
+
+
+@pytest.mark.parametrize('name, level', [
+    ('debug', logging.DEBUG),
+    ('WARNING', logging.WARNING),
+    ('info', logging.INFO),
+    ('basicconfig', logging.INFO),
+    ('getLogger', logging.INFO),
+    ('verbose', logging.INFO),
+    ('', logging.INFO),
+])
+def test_log_level(name, level):
+    assert _log_level(name) == level
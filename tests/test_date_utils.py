@@ -0,0 +1,30 @@
+import pytest
+
+from sendgrid_campaigns.utils.date_utils import parse_schedule_time
+
+
+@pytest.mark.parametrize('time_str, expected', [
+    ('2030-01-01 09:00:00', '2030-01-01T09:00:00Z'),
+    ('2024-02-29 23:59:59', '2024-02-29T23:59:59Z'),
+    ('2030-1-1 9:00:00', '2030-01-01T09:00:00Z'),
+    ('2030-01-01 9:5:7', '2030-01-01T09:05:07Z'),
+])
+def test_parse_schedule_time_accepted(time_str, expected):
+    assert parse_schedule_time(time_str) == expected
+
+
+@pytest.mark.parametrize('time_str', [
+    '2024-11-20 21:11:00+05:00',
+    '2024-11-20 21:11+00',
+    '2024-11-20T21:11:00',
+    '2024-11-20',
+    '20241120T211100',
+    '2024-W47-3 21:11:00',
+    '2024-13-20 21:11:00',
+    '2023-02-29 10:00:00',
+    '2024-11-20 21:11:0Z',
+    '',
+])
+def test_parse_schedule_time_rejected(time_str):
+    with pytest.raises(ValueError):
+        parse_schedule_time(time_str)
@@ -0,0 +1,253 @@
+import inspect
+import random
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+from io import BytesIO
+
+import pytest
+from PIL import ExifTags, Image
+
+from sendgrid_campaigns import eml_extractor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _jpeg(size=(200, 200), quality=40, mode='RGB', **save_args):
+    """Encodes a test JPEG; noisy content keeps re-encodes from shrinking it much"""
+    rng = random.Random(1)
+    image = Image.frombytes('RGB', size, rng.randbytes(size[0] * size[1] * 3)).convert(mode)
+    output = BytesIO()
+    image.save(output, format='JPEG', quality=quality, optimize=True, **save_args)
+    return output.getvalue()
+
+
+def _segments(jpeg_data):
+    return [marker for marker, _ in Image.open(BytesIO(jpeg_data)).applist]
+
+
+@pytest.fixture
+def no_accelerators(monkeypatch):
+    """Runs compress_image through the plain Pillow path"""
+    monkeypatch.setattr(eml_extractor, '_TJ', None)
+    monkeypatch.setattr(eml_extractor, 'pyvips', None)
+
+
+def test_small_low_quality_jpeg_is_kept_as_is(no_accelerators):
+    source = _jpeg(quality=40)
+    assert eml_extractor.compress_image(source) == source
+
+
+def test_jpeg_that_reencodes_smaller_is_reencoded(no_accelerators):
+    source = _jpeg(quality=95)
+    compressed = eml_extractor.compress_image(source)
+    assert len(compressed) < len(source)
+
+
+@pytest.mark.parametrize('save_args', [
+    {'exif': Image.Exif().tobytes()},
+    {'comment': b'taken at home'},
+    {'xmp': b'<x:xmpmeta>gps</x:xmpmeta>'},
+])
+def test_jpeg_with_metadata_is_reencoded_without_it(no_accelerators, save_args):
+    source = _jpeg(quality=40, **save_args)
+    compressed = eml_extractor.compress_image(source)
+    assert compressed != source
+    assert _segments(compressed) == ['APP0']
+
+
+class FakeTurboJPEG:
+    """Stands in for PyTurboJPEG, decoding with Pillow or failing like libjpeg-turbo"""
+    scaling_factors = frozenset({(1, 1), (1, 2), (1, 4), (1, 8)})
+
+    def __init__(self, decode_error=None):
+        self.decode_error = decode_error
+        self.decoded = 0
+
+    def decode_header(self, jpeg_data):
+        image = Image.open(BytesIO(jpeg_data))
+        colorspace = {'L': 2, 'RGB': 1, 'CMYK': 3}[image.mode]
+        return image.width, image.height, 0, colorspace
+
+    def decode(self, jpeg_data, pixel_format=None, scaling_factor=None):
+        if self.decode_error is not None:
+            raise self.decode_error
+        self.decoded += 1
+        image = Image.open(BytesIO(jpeg_data)).convert('RGB')
+        if scaling_factor:
+            image = image.reduce(scaling_factor[1])
+        return np.asarray(image)
+
+    def encode(self, pixels, quality=None, pixel_format=None, jpeg_subsample=None, flags=None):
+        output = BytesIO()
+        Image.fromarray(pixels).save(output, format='JPEG', quality=quality)
+        return output.getvalue()
+
+
+def _use_turbojpeg(monkeypatch, fake):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(eml_extractor, '_TJ', fake)
+    monkeypatch.setattr(eml_extractor, 'pyvips', None)
+    monkeypatch.setattr(eml_extractor, 'np', np, raising=False)
+    for name, value in [('TJPF_RGB', 0), ('TJSAMP_420', 2), ('TJFLAG_ACCURATEDCT', 4096),
+                        ('TJCS_CMYK', 3), ('TJCS_YCCK', 4)]:
+        monkeypatch.setattr(eml_extractor, name, value, raising=False)
+
+
+def test_pyturbojpeg_api_matches_usage():
+    turbojpeg = pytest.importorskip('turbojpeg')
+    decode_params = inspect.signature(turbojpeg.TurboJPEG.decode).parameters
+    encode_params = inspect.signature(turbojpeg.TurboJPEG.encode).parameters
+    assert {'pixel_format', 'scaling_factor'} <= set(decode_params)
+    assert {'quality', 'pixel_format', 'jpeg_subsample', 'flags'} <= set(encode_params)
+    assert isinstance(inspect.getattr_static(turbojpeg.TurboJPEG, 'scaling_factors'), property)
+
+
+def test_turbojpeg_decodes_rgb_jpeg(monkeypatch):
+    fake = FakeTurboJPEG()
+    _use_turbojpeg(monkeypatch, fake)
+    compressed = eml_extractor.compress_image(_jpeg(size=(2600, 300), quality=95))
+    assert fake.decoded == 1
+    assert Image.open(BytesIO(compressed)).size == (1200, 138)
+
+
+def test_cmyk_jpeg_is_decoded_with_pillow(monkeypatch):
+    fake = FakeTurboJPEG()
+    _use_turbojpeg(monkeypatch, fake)
+    compressed = eml_extractor.compress_image(_jpeg(size=(2600, 300), quality=95, mode='CMYK'))
+    image = Image.open(BytesIO(compressed))
+    assert fake.decoded == 0
+    assert (image.mode, image.size) == ('RGB', (1200, 138))
+
+
+@pytest.mark.parametrize('error', [OSError('boom'), ValueError('boom'), RuntimeError('boom')])
+def test_turbojpeg_errors_fall_back_to_pillow(monkeypatch, error):
+    _use_turbojpeg(monkeypatch, FakeTurboJPEG(decode_error=error))
+    compressed = eml_extractor.compress_image(_jpeg(size=(2600, 300), quality=95))
+    assert Image.open(BytesIO(compressed)).size == (1200, 138)
+
+
+@pytest.mark.parametrize('use_turbojpeg', [False, True])
+def test_truncated_jpeg_raises_value_error(monkeypatch, no_accelerators, use_turbojpeg):
+    if use_turbojpeg:
+        _use_turbojpeg(monkeypatch, FakeTurboJPEG(decode_error=RuntimeError('Premature end of JPEG file')))
+    source = _jpeg(size=(600, 600), quality=95)
+    with pytest.raises(ValueError, match='Failed to compress image'):
+        eml_extractor.compress_image(source[:len(source) // 2])
+
+
+def _png(size=(50, 40)):
+    output = BytesIO()
+    Image.new('RGBA', size, (255, 0, 0, 128)).save(output, format='PNG')
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('compressed, content_type, ext', [
+    (_jpeg(quality=40), 'image/jpeg', '.jpg'),
+    (_png(), 'image/png', '.png'),
+])
+def test_process_image_tags_upload_with_uploaded_format(monkeypatch, compressed, content_type, ext):
+    uploads = []
+    monkeypatch.setattr(eml_extractor, 'compress_image', lambda data: compressed)
+    monkeypatch.setattr(eml_extractor, 'upload_to_azure',
+                        lambda config, data, filename, content_type=None: uploads.append((filename, content_type)) or 'url')
+
+    # The source claims a different type than what gets uploaded
+    source = {'data': b'source', 'type': 'image/gif'}
+    filename, _ = eml_extractor.process_image(source, {}, 'campaign', 1)
+
+    assert uploads == [(filename, content_type)]
+    assert filename.endswith(ext)
+
+
+def test_png_source_is_uploaded_as_jpeg(monkeypatch, no_accelerators):
+    uploads = []
+    monkeypatch.setattr(eml_extractor, 'upload_to_azure',
+                        lambda config, data, filename, content_type=None: uploads.append((data, filename, content_type)) or 'url')
+
+    eml_extractor.process_image({'data': _png(), 'type': 'image/png'}, {}, 'campaign', 1)
+
+    [(data, filename, content_type)] = uploads
+    assert data[:2] == b'\xff\xd8'
+    assert (filename[-4:], content_type) == ('.jpg', 'image/jpeg')
+
+
+def _rotated_jpeg(orientation):
+    """A 300x100 JPEG, black on its left third, tagged with an EXIF orientation"""
+    image = Image.new('RGB', (300, 100), 'white')
+    image.paste((0, 0, 0), (0, 0, 100, 100))
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    output = BytesIO()
+    image.save(output, format='JPEG', quality=95, exif=exif.tobytes())
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('use_turbojpeg', [False, True])
+def test_exif_orientation_is_applied(monkeypatch, no_accelerators, use_turbojpeg):
+    if use_turbojpeg:
+        _use_turbojpeg(monkeypatch, FakeTurboJPEG())
+    source = _rotated_jpeg(6)
+
+    compressed = Image.open(BytesIO(eml_extractor.compress_image(source)))
+
+    # Orientation 6 displays the image rotated 90 degrees clockwise: the black third ends up on top
+    assert compressed.size == (100, 300)
+    assert compressed.getpixel((50, 20))[0] < 64
+    assert compressed.getpixel((50, 280))[0] > 192
+    assert 'exif' not in compressed.info
+
+
+def _image_part(payload):
+    raw = (b'Content-Type: image/png\r\nContent-Transfer-Encoding: base64\r\n'
+           b'Content-ID: <logo>\r\n\r\n' + payload + b'\r\n')
+    return BytesParser(policy=policy.default).parsebytes(raw)
+
+
+@pytest.mark.parametrize('use_pybase64', [False, True])
+@pytest.mark.parametrize('payload', [b'aGVsbG8gd29ybGQ=', b'aGVsbG8g\r\nd29ybGQ=', b'aGVsbG8gd29ybGQ'],
+                         ids=['padded', 'wrapped', 'bad-padding'])
+def test_fast_decode(monkeypatch, use_pybase64, payload):
+    monkeypatch.setattr(eml_extractor, 'pybase64', pytest.importorskip('pybase64') if use_pybase64 else None)
+    assert bytes(eml_extractor._fast_decode(_image_part(payload))) == b'hello world'
+
+
+def test_extract_html_from_eml(monkeypatch, no_accelerators, tmp_path):
+    uploads = {}
+
+    def upload(config, data, filename, content_type=None):
+        uploads[filename] = content_type
+        return f'https://cdn.example.com/{filename}'
+
+    monkeypatch.setattr(eml_extractor, 'upload_to_azure', upload)
+
+    message = EmailMessage()
+    message['Subject'] = 'Launch'
+    message.set_content('plain')
+    message.add_alternative(
+        '<html><body><p>Hi ä</p><a href="https://example.com">link</a>'
+        '<img src="cid:logo" width="10" height="20" class="x"><img src="cid:missing">'
+        '<img src="https://example.com/remote.png"></body></html>', subtype='html')
+    message.get_payload()[1].add_related(_png(), 'image', 'png', cid='<logo>')
+    eml_path = tmp_path / 'launch.eml'
+    eml_path.write_bytes(message.as_bytes())
+
+    config = {'azure_cdn_storage_account_name': 'account', 'azure_cdn_storage_account_key': 'key',
+              'azure_cdn_container_name': 'container'}
+    client = type('Client', (), {'config': config})()
+    html_path = tmp_path / 'out' / 'launch.html'
+
+    assert eml_extractor.extract_html_from_eml(client, str(eml_path), str(html_path)) == str(html_path)
+
+    [(filename, content_type)] = uploads.items()
+    html = html_path.read_bytes().decode('utf-8')
+    assert html.startswith('<!DOCTYPE html>') and html.endswith('</html>')
+    assert '<p>Hi ä</p>' in html
+    assert '<a clicktracking="off" href="https://example.com">link</a>' in html
+    assert f'<img src="https://cdn.example.com/{filename}" style="width:10px;height:20px"/>' in html
+    assert '<img src="cid:missing"/>' in html
+    assert '<img src="https://example.com/remote.png"/>' in html
+    assert content_type == 'image/jpeg'
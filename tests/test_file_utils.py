@@ -0,0 +1,22 @@
+import pytest
+
+from sendgrid_campaigns.utils.file_utils import parse_receivers_file
+
+RECEIVERS = [
+    b'Alice <alice@example.com>',
+    b'not a receiver',
+    b'Bob <bob@example.com>, Carol <carol@example.com>',
+    b'Dave < dave@example.com > <note>',
+    b'broken <unterminated',
+]
+
+
+@pytest.mark.parametrize('newline', [b'\n', b'\r\n', b'\r'], ids=['LF', 'CRLF', 'CR'])
+def test_parse_receivers_file_line_endings(tmp_path, newline):
+    path = tmp_path / 'receivers.txt'
+    path.write_bytes(newline.join(RECEIVERS) + newline)
+    assert parse_receivers_file(str(path)) == ['alice@example.com', 'bob@example.com', 'dave@example.com']
+
+
+def test_parse_receivers_file_without_path():
+    assert parse_receivers_file(None) == []
@@ -0,0 +1,35 @@
+import gc
+
+from sendgrid_campaigns.api import sender
+from tests.fakes import FakeResponse, FakeSendGrid
+
+
+def _client_with_sender(email):
+    client = FakeSendGrid()
+    client.route('GET', 'marketing/senders', FakeResponse(body=[{'id': 7, 'from': {'email': email}}]))
+    return client
+
+
+def test_senders_are_cached_per_client():
+    client = _client_with_sender('news@example.com')
+    assert sender.get_sender_email(client, 7) == 'news@example.com'
+    assert sender.get_sender_id(client, 'news@example.com') == 7
+    assert client.count('GET', 'marketing/senders') == 1
+
+
+def test_senders_cache_expires(monkeypatch):
+    client = _client_with_sender('news@example.com')
+    sender._get_senders(client, ttl=60)
+    now = sender.time.monotonic()
+    monkeypatch.setattr(sender.time, 'monotonic', lambda: now + 61)
+    sender._get_senders(client, ttl=60)
+    assert client.count('GET', 'marketing/senders') == 2
+
+
+def test_senders_cache_is_not_shared_with_a_new_client():
+    for account in range(20):
+        # Each client is freed before the next is built, so CPython readily reuses its id()
+        client = _client_with_sender(f'news{account}@example.com')
+        assert sender.get_sender_email(client, 7) == f'news{account}@example.com'
+        del client
+        gc.collect()
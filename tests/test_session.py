@@ -0,0 +1,105 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import orjson
+import pytest
+import requests
+from python_http_client import Client
+from python_http_client.exceptions import NotFoundError
+
+from sendgrid_campaigns.api import session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self._reply()
+
+    def _reply(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        server.requests.append((self.command, self.path, dict(self.headers), self.rfile.read(length)))
+        status, body = server.replies.pop(0) if server.replies else (200, {})
+        payload = orjson.dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.requests = []
+    httpd.replies = []
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    """A pooled SendGrid-style client pointed at the local server through the production adapter"""
+    local_session = requests.Session()
+    local_session.mount('http://', session._session.get_adapter('https://api.sendgrid.com'))
+    monkeypatch.setattr(session, '_session', local_session)
+
+    class SendGrid:
+        pass
+
+    sendgrid = SendGrid()
+    sendgrid.client = Client(host=f'http://127.0.0.1:{server.server_port}', version=3,
+                             request_headers={'Authorization': 'Bearer SG.test'})
+    return session.use_pooled_session(sendgrid)
+
+
+def test_adapter_retries_rate_limits_and_server_errors():
+    retry = session._session.get_adapter('https://api.sendgrid.com').max_retries
+    assert retry.total == 3
+    assert {429, 500, 502, 503, 504} <= set(retry.status_forcelist)
+
+
+def test_use_pooled_session_keeps_client_settings(client):
+    assert isinstance(client.client, session.SessionClient)
+    assert client.client._version == 3
+    assert client.client.request_headers['Authorization'] == 'Bearer SG.test'
+    assert isinstance(client.client.marketing.singlesends._('c1'), session.SessionClient)
+
+
+def test_request_is_sent_through_session(client, server):
+    server.replies.append((201, {'id': 'list-1'}))
+
+    response = client.client.marketing.lists.post(request_body={'name': 'List'})
+
+    assert (response.status_code, orjson.loads(response.body)) == (201, {'id': 'list-1'})
+    [(method, path, headers, body)] = server.requests
+    assert (method, path) == ('POST', '/v3/marketing/lists')
+    assert headers['Authorization'] == 'Bearer SG.test'
+    assert orjson.loads(body) == {'name': 'List'}
+
+
+def test_rate_limited_request_is_retried(client, server):
+    server.replies.extend([(429, {'errors': []}), (200, {'result': []})])
+
+    response = client.client.marketing.singlesends.get()
+
+    assert response.status_code == 200
+    assert len(server.requests) == 2
+
+
+def test_error_status_raises_python_http_client_error(client, server):
+    server.replies.append((404, {'errors': [{'message': 'not found'}]}))
+
+    with pytest.raises(NotFoundError) as raised:
+        client.client.marketing.singlesends._('missing').get()
+
+    assert raised.value.status_code == 404
+    assert orjson.loads(raised.value.body) == {'errors': [{'message': 'not found'}]}